@@ -7,39 +7,199 @@ import uuid
 import re
 import logging
 
+class _KeepChars(dict):
+    """str.translate table keeping digits and the given chars; filled lazily per code point."""
+
+    def __init__(self, keep):
+        super().__init__()
+        self.keep = keep
+
+    def __missing__(self, code):
+        char = chr(code)
+        result = code if char.isdigit() or char in self.keep else None
+        self[code] = result
+        return result
+
 class DataManager:
     faker = Faker()
     
     _default_date_format = "%Y-%m-%dT%H:%M:%S.%fZ"
+    _default_day_format = "%Y-%m-%d"
+    _default_chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+    # Format directives _truncate_datetime resolves without parsing, by the datetime field they keep
+    _datetime_directives = {
+        'Y': 'year', 'm': 'month', 'd': 'day', 'H': 'hour', 'I': 'hour',
+        'M': 'minute', 'S': 'second', 'f': 'microsecond', 'z': 'tzinfo',
+    }
+    # strptime defaults for the fields a format does not mention
+    _datetime_defaults = {
+        'year': 1900, 'month': 1, 'day': 1, 'hour': 0,
+        'minute': 0, 'second': 0, 'microsecond': 0, 'tzinfo': None,
+    }
+    _directive_pattern = re.compile(r'%(.)')
+    _datetime_truncate_cache = {}
+
+    # Types that read the current time (share a single datetime.now() per call)
+    _time_types = frozenset(('date', 'datetime', 'datetimeiso', 'unix_timestamp', 'unix_timestamp_as_string'))
+
+    # Types that produce the same value on every call
+    _static_types = frozenset(('constant', 'constant_string', 'constant_int'))
 
     # Regex cache for concat (avoid recompiling)
     _concat_pattern = re.compile(r"\{@\w+\}")
+
+    # Translation tables used to clean strings before int/float conversion
+    _int_keep = _KeepChars('-')
+    _float_keep = _KeepChars('.-')
+
+    # Resolved Faker methods by method_name: (first method, its name, chained parts)
+    _faker_method_cache = {}
     
-    # Type-to-function mapping (avoid giant if/elif chain)
-    _type_generators = {
-        'guid': lambda p, v: uuid.uuid4(),
-        'objectid': lambda p, v: ObjectId(),
-        'datetime': lambda p, v: datetime.strptime(
-            datetime.now(timezone.utc).strftime(p.get('format', DataManager._default_date_format)),
-            p.get('format', DataManager._default_date_format)
-        ),
-        'unix_timestamp': lambda p, v: int(datetime.now(timezone.utc).timestamp()),
-        'random_int': lambda p, v: random.randint(p.get('start', 0), p.get('end', 100)),
-        'random_float': lambda p, v: random.uniform(p.get('start', 0.0), p.get('end', 1.0)),
-        'random_list': lambda p, v: random.choice(p.get('list', [])),
-        'random_bool': lambda p, v: random.choice([True, False]),
-        'random_string': lambda p, v: ''.join(random.choice(
-            p.get('chars', "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
-        ) for _ in range(p.get('length', 10))),
-        'constant': lambda p, v: p.get('value'),
-    }
+    # Type-to-function mapping (avoid giant if/elif chain), populated after the class body
+    _type_generators = {}
+
+    # Types that can generate a whole batch column in one call (bound like _param_binders), populated after the class body
+    _bulk_generators = {}
+
+    # Types whose settings can be resolved once into a generator of 'now', populated after the class body
+    _param_binders = {}
+
+    # Generators share the (param, values, now) signature used by _type_generators
+    @staticmethod
+    def _gen_date(p, v, now):
+        return now.strftime(p.get('format', DataManager._default_day_format))
+
+    @staticmethod
+    def _gen_datetimeiso(p, v, now):
+        return now.isoformat()
+
+    @staticmethod
+    def _gen_unix_timestamp(p, v, now):
+        return int(now.timestamp())
+
+    @staticmethod
+    def _gen_unix_timestamp_as_string(p, v, now):
+        return str(int(now.timestamp()))
+
+    @staticmethod
+    def _gen_constant(p, v, now):
+        return p.get('value')
+
+    @staticmethod
+    def _gen_constant_string(p, v, now):
+        return DataManager._convert_type(p.get('value', ''), 'string', p)
+
+    @staticmethod
+    def _gen_constant_int(p, v, now):
+        return DataManager._convert_type(p.get('value', 0), 'int', p)
+    
+    # Settings shared by the row binder and the column binder of a type
+    @staticmethod
+    def _int_range(p):
+        return p.get('start', 0), p.get('end', 100)
+
+    @staticmethod
+    def _float_range(p):
+        return p.get('start', 0.0), p.get('end', 1.0)
+
+    _bool_values = (True, False)
+
+    # Bulk binders take a param and return a generator called as gen(count)
+    @staticmethod
+    def _bulk_random_int(p):
+        start, end = DataManager._int_range(p)
+        randint = random.randint
+        # choices() draws indexes from 53 random bits, so it is only uniform (and len(range) only fits) below 2**53
+        if end - start >= 2 ** 53:
+            return lambda count: [randint(start, end) for _ in range(count)]
+        values = range(start, end + 1)
+        choices = random.choices
+        return lambda count: choices(values, k=count)
+
+    @staticmethod
+    def _bulk_random_float(p):
+        start, end = DataManager._float_range(p)
+        span = end - start
+        rand = random.random
+        return lambda count: [start + span * rand() for _ in range(count)]
+
+    @staticmethod
+    def _bulk_random_bool(p):
+        choices = random.choices
+        return lambda count: choices(DataManager._bool_values, k=count)
+
+    # Binders take a param and return a generator with its settings pre-extracted
+    @staticmethod
+    def _bind_guid(p):
+        uuid4 = uuid.uuid4
+        return lambda now: uuid4()
+
+    @staticmethod
+    def _bind_objectid(p):
+        return lambda now: ObjectId()
+
+    @staticmethod
+    def _bind_datetime(p):
+        date_format = p.get('format', DataManager._default_date_format)
+        truncate = DataManager._truncate_datetime
+        return lambda now: truncate(now or datetime.now(timezone.utc), date_format)
+
+    @staticmethod
+    def _bind_random_int(p):
+        start, end = DataManager._int_range(p)
+        randint = random.randint
+        return lambda now: randint(start, end)
+
+    @staticmethod
+    def _bind_random_float(p):
+        start, end = DataManager._float_range(p)
+        uniform = random.uniform
+        return lambda now: uniform(start, end)
+
+    @staticmethod
+    def _bind_random_list(p):
+        items = p.get('list', [])
+        choice = random.choice
+        return lambda now: choice(items)
+
+    @staticmethod
+    def _bind_random_bool(p):
+        choice = random.choice
+        return lambda now: choice(DataManager._bool_values)
+
+    @staticmethod
+    def _bind_random_string(p):
+        chars, length = p.get('chars', DataManager._default_chars), p.get('length', 10)
+        choices = random.choices
+        return lambda now: ''.join(choices(chars, k=length))
+
+    @staticmethod
+    def compile_param(param):
+        """
+        Resolves a parameter once into a generator called as gen(now), where now
+        is the shared current time or None. Types without a binder go through
+        generate_param_value.
+        """
+        binder = DataManager._param_binders.get(param.get('type').lower())
+        if binder is None:
+            return lambda now: DataManager.generate_param_value(param, now=now)
+
+        raw = binder(param)
+        output_type = param.get('as')
+        if output_type:
+            output_type = output_type.lower()
+            convert = DataManager._convert_type
+            return lambda now: convert(raw(now), output_type, param)
+
+        return raw
     
     @staticmethod
-    def generate_param_value(param, values=None):
+    def generate_param_value(param, values=None, now=None):
         param_type = param.get('type').lower()
         values = values or {}
 
-        raw_value = DataManager._generate_raw_value(param_type, param, values)
+        raw_value = DataManager._generate_raw_value(param_type, param, values, now)
         
         output_type = param.get('as')
         if output_type:
@@ -49,12 +209,43 @@ class DataManager:
         return raw_value
 
     @staticmethod
-    def _generate_raw_value(param_type, param, values):
+    def compile_param_column(param):
+        """Resolves a bulk-capable parameter once into a generator called as gen(count)."""
+        bulk = DataManager._bulk_generators[param.get('type').lower()](param)
+
+        output_type = param.get('as')
+        if output_type:
+            output_type = output_type.lower()
+            convert = DataManager._convert_type
+            return lambda count: [convert(value, output_type, param) for value in bulk(count)]
+
+        return bulk
+
+    @staticmethod
+    def supports_bulk(param):
+        """Returns True if the parameter can be generated a whole column at a time."""
+        return param.get('type', '').lower() in DataManager._bulk_generators
+
+    @staticmethod
+    def is_static(param):
+        """Returns True if the parameter produces the same value on every call."""
+        return param.get('type', '').lower() in DataManager._static_types
+
+    @staticmethod
+    def uses_current_time(parameters):
+        """Returns True if any parameter reads the current time."""
+        return any(param.get('type', '').lower() in DataManager._time_types for param in parameters)
+
+    @staticmethod
+    def _generate_raw_value(param_type, param, values, now=None):
         """Generates raw value based on type (optimized with dict lookup)."""
         
         # Dict lookup is O(1) vs if/elif which is O(n)
         if param_type in DataManager._type_generators:
-            return DataManager._type_generators[param_type](param, values)
+            # Single clock read per call; callers may pass a shared 'now'
+            if now is None and param_type in DataManager._time_types:
+                now = datetime.now(timezone.utc)
+            return DataManager._type_generators[param_type](param, values, now)
         
         # Concat needs special logic
         if param_type == "concat":
@@ -66,7 +257,38 @@ class DataManager:
         
         logging.warning(f"Unknown parameter type: {param_type}. Returning empty string.")
         return ""
-    
+
+    @staticmethod
+    def _truncate_datetime(now, date_format):
+        """Equivalent of datetime.strptime(now.strftime(date_format), date_format), compiled once per format."""
+        truncate = DataManager._datetime_truncate_cache.get(date_format)
+        if truncate is None:
+            truncate = DataManager._compile_truncate(date_format)
+            DataManager._datetime_truncate_cache[date_format] = truncate
+        return truncate(now)
+
+    @staticmethod
+    def _compile_truncate(date_format):
+        """
+        Resolve the strftime/strptime round trip for date_format into a datetime.replace:
+        fields the format keeps stay, the rest take strptime's defaults. Formats with other
+        directives (or %I with %H) keep the round trip.
+        """
+        directives = [d for d in DataManager._directive_pattern.findall(date_format) if d != '%']
+        known = DataManager._datetime_directives
+        if (any(d not in known for d in directives) or len(set(directives)) != len(directives)
+                or ('H' in directives and 'I' in directives)
+                or '%' in DataManager._directive_pattern.sub('', date_format)):
+            strptime = datetime.strptime
+            return lambda now: strptime(now.strftime(date_format), date_format)
+
+        kept = {known[d] for d in directives}
+        reset = {field: value for field, value in DataManager._datetime_defaults.items() if field not in kept}
+        if 'I' in directives:
+            # Without %p, strptime reads the 12-hour clock value as-is
+            return lambda now: now.replace(hour=now.hour % 12, **reset)
+        return lambda now: now.replace(**reset)
+
     @staticmethod
     def _handle_concat(param, values):
         """Concat optimization using list comprehension and cached regex."""
@@ -108,15 +330,15 @@ class DataManager:
                 if isinstance(value, bool):
                     return 1 if value else 0
                 if isinstance(value, str):
-                    # Optimization: filter is faster than loop
-                    cleaned = ''.join(filter(lambda c: c.isdigit() or c == '-', value))
+                    # Optimization: translate keeps the per-char work in C
+                    cleaned = value.translate(DataManager._int_keep)
                     return int(cleaned) if cleaned else 0
                 return int(value)
             
             # Float conversion
             if target_type in ("float", "decimal"):
                 if isinstance(value, str):
-                    cleaned = ''.join(filter(lambda c: c.isdigit() or c in '.-', value))
+                    cleaned = value.translate(DataManager._float_keep)
                     return float(cleaned) if cleaned else 0.0
                 return float(value)
             
@@ -169,12 +391,15 @@ class DataManager:
             new: ", "
         """
         try:
-            # Parse method chain (e.g., "date_time.timestamp" -> ["date_time", "timestamp"])
-            method_parts = method_name.split('.')
-            
-            # Get the first Faker method
-            first_method = method_parts[0]
-            faker_method = getattr(DataManager.faker, first_method, None)
+            cached = DataManager._faker_method_cache.get(method_name)
+            if cached is None:
+                # Parse method chain (e.g., "date_time.timestamp" -> ["date_time", "timestamp"])
+                method_parts = method_name.split('.')
+                
+                # Resolve the first Faker method once per method_name
+                cached = (getattr(DataManager.faker, method_parts[0], None), method_parts[0], method_parts[1:])
+                DataManager._faker_method_cache[method_name] = cached
+            faker_method, first_method, chain_parts = cached
             if faker_method is None:
                 logging.warning(f"Faker method '{first_method}' not found. Returning empty string.")
                 return ""
@@ -184,11 +409,11 @@ class DataManager:
             result = faker_method(**args) if callable(faker_method) else faker_method
             
             # Chain remaining methods automatically
-            for method_part in method_parts[1:]:
+            for method_part in chain_parts:
                 if hasattr(result, method_part):
                     chained_method = getattr(result, method_part)
                     # For chained methods, args apply to them
-                    result = chained_method(**args) if callable(chained_method) and method_part == method_parts[-1] and args else (
+                    result = chained_method(**args) if callable(chained_method) and method_part == chain_parts[-1] and args else (
                         chained_method() if callable(chained_method) else chained_method
                     )
                 else:
@@ -203,4 +428,36 @@ class DataManager:
                 
         except Exception as e:
             logging.error(f"Error calling Faker method '{method_name}': {e}")
-            return ""
\ No newline at end of file
+            return ""
+
+DataManager._param_binders.update({
+    'guid': DataManager._bind_guid,
+    'objectid': DataManager._bind_objectid,
+    'datetime': DataManager._bind_datetime,
+    'random_int': DataManager._bind_random_int,
+    'random_float': DataManager._bind_random_float,
+    'random_list': DataManager._bind_random_list,
+    'random_bool': DataManager._bind_random_bool,
+    'random_string': DataManager._bind_random_string,
+})
+
+DataManager._type_generators.update({
+    'date': DataManager._gen_date,
+    'datetimeiso': DataManager._gen_datetimeiso,
+    'unix_timestamp': DataManager._gen_unix_timestamp,
+    'unix_timestamp_as_string': DataManager._gen_unix_timestamp_as_string,
+    'constant': DataManager._gen_constant,
+    'constant_string': DataManager._gen_constant_string,
+    'constant_int': DataManager._gen_constant_int,
+})
+# Types with a binder are defined once, by the binder
+DataManager._type_generators.update({
+    param_type: (lambda bind: lambda p, v, now: bind(p)(now))(binder)
+    for param_type, binder in DataManager._param_binders.items()
+})
+
+DataManager._bulk_generators.update({
+    'random_int': DataManager._bulk_random_int,
+    'random_float': DataManager._bulk_random_float,
+    'random_bool': DataManager._bulk_random_bool,
+})
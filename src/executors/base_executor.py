@@ -1,17 +1,32 @@
 import re
-import copy
-from typing import Any, Dict, List
+import logging
+import math
+import bson
+import gevent
+import pickle
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from collections import defaultdict
+from functools import reduce
+from operator import getitem
 
 class BaseExecutor:
     abstract = True
     _param_pattern = re.compile(r'@\w+')
+    # Compiled template builders shared by all executors, keyed by template structure
+    _template_builders: Dict[Any, Callable[[Dict[str, Any]], Any]] = {}
 
     def __init__(self, environment):
         self.environment = environment
 
+    # Successful request events queued while the flusher greenlet runs, reported in batches
+    _event_buffer: List[Tuple[str, str, float, int]] = []
+    _event_flusher: Optional[gevent.Greenlet] = None
+
     def _fire_event(self, request_type: str, name: str, response_time: float, exception: Exception = None, response_length: int = 0) -> None:
-        """Fire a request event."""
+        """Fire a request event; successes are queued for the flusher when it is running."""
+        if exception is None and BaseExecutor._event_flusher is not None:
+            BaseExecutor._event_buffer.append((request_type, name, response_time, response_length))
+            return
         self.environment.events.request.fire(
             request_type=request_type,
             name=name,
@@ -20,50 +35,170 @@ class BaseExecutor:
             response_length=response_length,
         )
 
+    @staticmethod
+    def flush_events(environment: Any) -> None:
+        """Fire every queued request event."""
+        buffer = BaseExecutor._event_buffer
+        if not buffer:
+            return
+        BaseExecutor._event_buffer = []
+        fire = environment.events.request.fire
+        for request_type, name, response_time, response_length in buffer:
+            fire(
+                request_type=request_type,
+                name=name,
+                response_time=response_time,
+                exception=None,
+                response_length=response_length,
+            )
+
+    @staticmethod
+    def start_event_flusher(environment: Any, interval: float = 0.1) -> None:
+        """Start queueing successful request events and fire them from a greenlet every interval seconds."""
+        def run():
+            while True:
+                gevent.sleep(interval)
+                BaseExecutor.flush_events(environment)
+        if BaseExecutor._event_flusher is None:
+            BaseExecutor._event_flusher = gevent.spawn(run)
+
+    @staticmethod
+    def stop_event_flusher(environment: Any) -> None:
+        """Stop the flusher greenlet and fire the events still queued."""
+        flusher = BaseExecutor._event_flusher
+        BaseExecutor._event_flusher = None
+        if flusher is not None:
+            flusher.kill()
+        BaseExecutor.flush_events(environment)
+
     def _connect(self) -> None:
         raise NotImplementedError("Subclasses must implement this method.")
     
     def _disconnect(self) -> None:
         raise NotImplementedError("Subclasses must implement this method.")
 
-    def _map_all_param_paths(self, obj: Any, param_names: List[str]) -> Dict[str, List[List[Any]]]:
-        """Map all parameter names to their paths in a nested object."""
+    def _map_all_param_paths(self, obj: Any, param_names: List[str]) -> Dict[str, List[Tuple[Any, ...]]]:
+        """Map all parameter names to their paths (as tuples) in a nested object."""
         result = defaultdict(list)
-        def recurse(o, current_path=None):
-            if current_path is None:
-                current_path = []
+        def recurse(o, current_path=()):
             if isinstance(o, dict):
                 for k, v in o.items():
                     for param in param_names:
                         if v == param:
-                            result[param].append(current_path + [k])
+                            result[param].append(current_path + (k,))
                     if isinstance(v, (dict, list)):
-                        recurse(v, current_path + [k])
+                        recurse(v, current_path + (k,))
             elif isinstance(o, list):
                 for idx, item in enumerate(o):
                     for param in param_names:
                         if item == param:
-                            result[param].append(current_path + [idx])
+                            result[param].append(current_path + (idx,))
                     if isinstance(item, (dict, list)):
-                        recurse(item, current_path + [idx])
+                        recurse(item, current_path + (idx,))
         recurse(obj)
         return dict(result)
 
-    def _replace_json_param_at_paths(self, obj: Any, paths: List[List[Any]], value: Any) -> Any:
-        """Replace all occurrences at the given paths in obj with value."""
-        for path in paths:
-            target = obj
-            for key in path[:-1]:
-                target = target[key]
-            target[path[-1]] = value
+    def _clone_json(self, obj: Any) -> Any:
+        """Copy the dict/list structure of a template; scalars are shared, as they are never mutated."""
+        if isinstance(obj, dict):
+            return {k: self._clone_json(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [self._clone_json(v) for v in obj]
         return obj
 
-    def _replace_all_params(self, obj: Any, param_paths_dict: Dict[str, List[List[Any]]], param_values: Dict[str, Any], deepcopy_obj: bool = True) -> Any:
-        """Replace all parameters in obj using the provided paths and values."""
-        obj_copy = copy.deepcopy(obj) if deepcopy_obj else obj
-        for param, paths in param_paths_dict.items():
-            self._replace_json_param_at_paths(obj_copy, paths, param_values[param])
-        return obj_copy    
+    def _copy_template(self, obj: Any) -> Any:
+        """
+        Clone a template, falling back to a BSON round trip if it is too deep to clone recursively.
+        The C codec only reaches about twice the recursion limit; deeper templates are unsupported.
+        """
+        try:
+            return self._clone_json(obj)
+        except RecursionError:
+            try:
+                return bson.decode(bson.encode({'t': obj}))['t']
+            except RecursionError as e:
+                raise ValueError("Template is nested too deeply to copy") from e
+
+    def _build_param_plan(self, param_paths_dict: Dict[str, List[Tuple[Any, ...]]]) -> List[Tuple[Tuple[Any, ...], Any, str]]:
+        """Flatten parameter paths into (parent path, last key, parameter name) steps."""
+        return [(path[:-1], path[-1], param) for param, paths in param_paths_dict.items() for path in paths]
+
+    def _template_skeleton(self, obj: Any) -> Callable[[], Any]:
+        """Return a function producing fresh copies of obj, unpickling a pre-serialized skeleton when possible."""
+        try:
+            skeleton = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+            return lambda: self._copy_template(obj)
+        loads = pickle.loads
+        return lambda: loads(skeleton)
+
+    def _apply_param_plan(self, obj_copy: Any, plan: List[Tuple[Tuple[Any, ...], Any, str]], param_values: Dict[str, Any]) -> Any:
+        """Set each planned parameter on a fresh copy; reduce/getitem keep the path walk in C."""
+        for parent, key, param in plan:
+            reduce(getitem, parent, obj_copy)[key] = param_values[param]
+        return obj_copy
+
+    def _compile_template(self, obj: Any, param_names: List[str]) -> Callable[[Dict[str, Any]], Any]:
+        """
+        Compile a template into a function that builds a fresh copy of it with
+        parameters substituted, e.g. {'a': '@x'} -> lambda __pv: {'a': __pv['@x']}.
+        Falls back to path replacement if the template cannot be compiled.
+        """
+        names = set(param_names)
+        consts = []
+
+        def emit_const(o):
+            if o is None or type(o) in (str, int, bool) or (type(o) is float and math.isfinite(o)):
+                return repr(o)
+            consts.append(o)
+            return f"__c[{len(consts) - 1}]"
+
+        def emit(o):
+            if isinstance(o, dict):
+                return "{" + ", ".join(f"{emit_const(k)}: {emit(v)}" for k, v in o.items()) + "}"
+            if isinstance(o, list):
+                return "[" + ", ".join(emit(item) for item in o) + "]"
+            if isinstance(o, str) and o in names:
+                return f"__pv[{o!r}]"
+            return emit_const(o)
+
+        try:
+            source = f"def _build(__pv):\n    return {emit(obj)}\n"
+            namespace = {'__c': consts}
+            exec(compile(source, "<template>", "exec"), namespace)
+            return namespace['_build']
+        except (SyntaxError, RecursionError, MemoryError, ValueError) as e:
+            logging.debug(f"Template compilation failed, using path replacement: {e}")
+            try:
+                plan = self._build_param_plan(self._map_all_param_paths(obj, param_names))
+            except RecursionError as e:
+                raise ValueError("Template is nested too deeply to map its parameters") from e
+            new_copy = self._template_skeleton(obj)
+            return lambda param_values: self._apply_param_plan(new_copy(), plan, param_values)
+
+    def _template_structure(self, obj: Any) -> Any:
+        """Build a hashable representation of a template that distinguishes values by type."""
+        if isinstance(obj, dict):
+            return ('dict', tuple((self._template_structure(k), self._template_structure(v)) for k, v in obj.items()))
+        if isinstance(obj, list):
+            return ('list', tuple(self._template_structure(item) for item in obj))
+        try:
+            hash(obj)
+            return (type(obj), obj)
+        except TypeError:
+            return (type(obj), repr(obj))
+
+    def _get_template_builder(self, obj: Any, param_names: List[str]) -> Callable[[Dict[str, Any]], Any]:
+        """Return a cached builder for the template, compiling it once per distinct structure."""
+        try:
+            key = (self._template_structure(obj), frozenset(param_names))
+        except RecursionError:
+            return self._compile_template(obj, param_names)
+        builder = BaseExecutor._template_builders.get(key)
+        if builder is None:
+            builder = self._compile_template(obj, param_names)
+            BaseExecutor._template_builders[key] = builder
+        return builder
 
     def execute(self, command: Any) -> None:
         """Subclasses must implement this method."""
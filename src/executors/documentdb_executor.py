@@ -1,43 +1,285 @@
+import gevent
 import logging
+import re
 import settings
-import sys
+import threading
 import time
 import yaml
 
+from dataclasses import dataclass
 from datamanager import DataManager
+from datetime import datetime, timezone
 from executors.base_executor import BaseExecutor
 from pathlib import Path
-from pymongo import MongoClient
-from typing import Any, Dict, Optional
+from pymongo import DeleteOne, IndexModel, InsertOne, MongoClient, ReplaceOne, UpdateOne, WriteConcern
+from pymongo.errors import PyMongoError
+from typing import Any, Dict, List, Optional
 
 logging.getLogger("pymongo").setLevel(logging.INFO)
+_log = logging.getLogger(__name__)
+
+# Operation kinds resolved once per command and dispatched with int compares
+OP_INSERT_ONE, OP_INSERT_MANY, OP_FIND, OP_AGGREGATE, OP_UPDATE, OP_REPLACE, OP_DELETE = range(7)
+OP_KINDS = {
+    'insert': OP_INSERT_ONE,
+    'find': OP_FIND,
+    'aggregate': OP_AGGREGATE,
+    'update': OP_UPDATE,
+    'replace': OP_REPLACE,
+    'delete': OP_DELETE,
+}
+
+@dataclass(slots=True, frozen=True)
+class CommandPlan:
+    """A task command with every field execute needs resolved once, when the task is created."""
+    task_name: str
+    cache_key: str
+    command_type: str
+    db_name: str
+    collection_name: Optional[str]
+    batch_size: int
+    json_template: Any
+    update_template: Any
+    parameters: List[Dict[str, Any]]
+    projection: Optional[Dict[str, Any]]
+    limit: int
+    sort: Any
+    bulk_write_size: int
+    bulk_write_max_delay_ms: int
+
+    @staticmethod
+    def from_command(command: Dict, task_name: str, cache_key: Optional[str] = None) -> 'CommandPlan':
+        command_type = command.get('type')
+        update_template = {}
+        if command_type == 'insert':
+            json_template = command.get('document', {})
+        elif command_type == 'aggregate':
+            json_template = command.get('pipeline', [])
+        elif command_type in ('find', 'delete', 'update', 'replace'):
+            json_template = command.get('filter', {})
+            if command_type == 'update':
+                update_template = command.get('update', {})
+            elif command_type == 'replace':
+                update_template = command.get('replacement', {})
+        else:
+            json_template = {}
+
+        is_find = command_type == 'find'
+        return CommandPlan(
+            task_name=task_name,
+            cache_key=cache_key if cache_key is not None else f"{task_name}:{command_type}",
+            command_type=command_type,
+            db_name=command.get('database'),
+            collection_name=command.get('collection'),
+            batch_size=command.get('batchSize', 1),
+            json_template=json_template,
+            update_template=update_template,
+            parameters=command.get('parameters', []),
+            projection=command.get('projection', None) if is_find else None,
+            limit=command.get('limit', 0) if is_find else 0,
+            sort=command.get('sort', None) if is_find else None,
+            bulk_write_size=command.get('bulkWriteSize', 0),
+            bulk_write_max_delay_ms=command.get('bulkWriteMaxDelayMs', 1000)
+        )
+
+def _response_length(op_kind: int, result: Any, documents: List[Any]) -> int:
+    """Documents returned (find/aggregate) or written (insert); single-document writes count as one."""
+    if op_kind == OP_FIND or op_kind == OP_AGGREGATE:
+        return len(result)
+    if op_kind == OP_INSERT_ONE or op_kind == OP_INSERT_MANY:
+        return len(documents)
+    return 1
 
 class DocumentDBExecutor(BaseExecutor):
+    # MongoClient is thread-safe and pools connections, so users share one per connection string
+    _clients: Dict[str, MongoClient] = {}
+    _client_lock = threading.Lock()
+    # Pool and wire compression defaults for the shared client; options set in the connection string take precedence
+    _default_client_options = {'maxPoolSize': 200, 'minPoolSize': 10, 'maxIdleTimeMS': 300000, 'compressors': 'zstd,snappy,zlib'}
+    _uri_max_pool_size = re.compile(r'[?&]maxpoolsize=(\d+)')
+
     def __init__(self, environment: Any):
         super().__init__(environment)
         self.client: Optional[MongoClient] = None
         self.db = None
         self._connect()
         self._param_map_cache: Dict[str, Dict] = {}
+        self._write_buffers: Dict[str, Dict] = {}
+
+    def _client_options(self, connection_string: str) -> Dict[str, Any]:
+        """Options for the shared client: defaults not set in the URI, then the CLI overrides."""
+        uri = connection_string.lower()
+        client_options = {k: v for k, v in self._default_client_options.items() if f"{k.lower()}=" not in uri}
+        parsed_options = self.environment.parsed_options
+        max_pool_size = parsed_options.documentdb_max_pool_size
+        if max_pool_size is not None:
+            client_options['maxPoolSize'] = max_pool_size
+        compressors = parsed_options.documentdb_compressors
+        if compressors is not None:
+            client_options['compressors'] = [] if compressors.lower() == 'none' else compressors
+
+        # pymongo rejects a minPoolSize above maxPoolSize (0, "no limit", included), so the default only applies to pools it fits
+        if 'minPoolSize' in client_options:
+            effective_max = client_options.get('maxPoolSize')
+            if effective_max is None:
+                uri_max = self._uri_max_pool_size.search(uri)
+                effective_max = int(uri_max.group(1)) if uri_max else None
+            if effective_max is not None and effective_max < client_options['minPoolSize']:
+                del client_options['minPoolSize']
+        return client_options
 
     def _connect(self) -> None:
         try:
-            self.client = MongoClient(
-                self.environment.parsed_options.documentdb_connection_string,
-                serverSelectionTimeoutMS=5000
-            )
-            logging.debug("DocumentDB connection established.")
+            # Read per user: the web UI can change the connection string between runs
+            connection_string = self.environment.parsed_options.documentdb_connection_string
+            cls = type(self)
+            with cls._client_lock:
+                client = cls._clients.get(connection_string)
+                if client is None:
+                    # Users share this pool, so it bounds the in-flight operations per process
+                    client = MongoClient(
+                        connection_string,
+                        serverSelectionTimeoutMS=5000,
+                        **self._client_options(connection_string)
+                    )
+                    cls._clients[connection_string] = client
+                    _log.debug("DocumentDB connection established.")
+            self.client = client
         except Exception as e:
             logging.exception(f"DocumentDB connection error: {e}")
             self.client = None
             self.db = None
 
     def _disconnect(self) -> None:
+        self.flush_writes()
+        # Only release this executor's reference; the shared client stays open for other users
         if self.client:
-            self.client.close()
             self.client = None
             self.db = None
+
+    def _param_generators(self, parameters: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Compile the parameter generators _generate_param_rows draws from."""
+        # Constant parameters are evaluated once; the rest are generated per row
+        static_params = [param for param in parameters if DataManager.is_static(param)]
+        dynamic_params = [param for param in parameters if not DataManager.is_static(param)]
+        return {
+            'uses_now': DataManager.uses_current_time(parameters),
+            'static_values': {param['name']: DataManager.generate_param_value(param) for param in static_params},
+            'dynamic_generators': [(param['name'], DataManager.compile_param(param)) for param in dynamic_params],
+            'bulk_generators': [(param['name'], DataManager.compile_param_column(param)) for param in dynamic_params if DataManager.supports_bulk(param)],
+            'row_generators': [(param['name'], DataManager.compile_param(param)) for param in dynamic_params if not DataManager.supports_bulk(param)],
+        }
+
+    def _generate_param_rows(self, cache: Dict, batch_size: int) -> List[Dict[str, Any]]:
+        """Generate the parameter values for every batch row, one stage (and comprehension) at a time."""
+        row_generators = cache['dynamic_generators']
+        bulk_generators = cache['bulk_generators'] if batch_size > 1 else None
+        if bulk_generators:
+            row_generators = cache['row_generators']
+
+        nows = [datetime.now(timezone.utc) for _ in range(batch_size)] if cache['uses_now'] else [None] * batch_size
+        rows = [{name: generate(now) for name, generate in row_generators} for now in nows]
+
+        # Numeric random parameters are generated as whole columns for multi-row batches
+        if bulk_generators:
+            names = [name for name, _ in bulk_generators]
+            columns = zip(*[generate(batch_size) for _, generate in bulk_generators])
+            for row, values in zip(rows, columns):
+                row.update(zip(names, values))
+
+        static_values = cache['static_values']
+        if static_values:
+            for row in rows:
+                row.update(static_values)
+        return rows
+
+    def _write_operations(self, command_type: str, documents: List[Dict], filter_doc: Dict, update_doc: Dict) -> List[Any]:
+        """Wrap the built command as bulk_write operations."""
+        if command_type == 'insert':
+            return [InsertOne(document) for document in documents]
+        if command_type == 'update':
+            return [UpdateOne(filter_doc, update_doc, upsert=True)]
+        if command_type == 'replace':
+            return [ReplaceOne(filter_doc, update_doc, upsert=True)]
+        return [DeleteOne(filter_doc)]
+
+    def _buffer_writes(self, buffer_key: str, task_name: str, collection: Any, operations: List[Any], flush_size: int, max_delay_ms: int) -> None:
+        """Queue write operations; flush them once flush_size is reached or the oldest has waited max_delay_ms."""
+        buffer = self._write_buffers.get(buffer_key)
+        if buffer is None:
+            buffer = {'task_name': task_name, 'collection': collection, 'operations': [], 'started': 0}
+            self._write_buffers[buffer_key] = buffer
+        if not buffer['operations']:
+            started = time.perf_counter_ns()
+            buffer['started'] = started
+            # Flush on time even if this task does not run again before the delay expires
+            gevent.spawn_later(max_delay_ms / 1000, self._flush_expired, buffer, started)
+        buffer['operations'].extend(operations)
+
+        if len(buffer['operations']) >= flush_size or (time.perf_counter_ns() - buffer['started']) // 1_000_000 >= max_delay_ms:
+            self._flush_writes(buffer)
+
+    def _flush_expired(self, buffer: Dict, started: int) -> None:
+        """Timer callback: flush the buffer if it still holds the operations queued at started."""
+        if buffer['operations'] and buffer['started'] == started:
+            self._flush_writes(buffer)
+
+    def _flush_writes(self, buffer: Dict) -> None:
+        """Send the buffered operations as one unordered bulk_write and fire a single event for it."""
+        operations = buffer['operations']
+        buffer['operations'] = []
+        task_name = buffer['task_name']
+
+        start_ns = time.perf_counter_ns()
+        try:
+            buffer['collection'].bulk_write(operations, ordered=False)
+        except Exception as e:
+            self._report_error(task_name, (time.perf_counter_ns() - start_ns) // 1_000_000, e, "Error executing DocumentDB bulk write")
+            return
+        self._fire_event('DocumentDB', task_name, (time.perf_counter_ns() - start_ns) // 1_000_000, response_length=len(operations))
+
+    def _report_error(self, task_name: str, total_time: int, exception: Exception, message: str) -> None:
+        """Fire a failed request; driver errors are expected under load and are logged without a traceback."""
+        self._fire_event('DocumentDB-Error', task_name, total_time, exception=exception)
+        if isinstance(exception, PyMongoError):
+            logging.error(f"{message}: {exception}")
+        else:
+            logging.exception(f"{message}: {exception}")
+
+    def flush_writes(self) -> None:
+        """Flush every pending write buffer."""
+        for buffer in self._write_buffers.values():
+            if buffer['operations']:
+                self._flush_writes(buffer)
+
+    @classmethod
+    def close_clients(cls) -> None:
+        """Close the shared clients; called once when the Locust process quits."""
+        with cls._client_lock:
+            for client in cls._clients.values():
+                client.close()
+            cls._clients.clear()
     
+    def _seed_collection(self, collection: Any, seed: Dict) -> None:
+        """Insert seed['count'] generated documents in unordered, unacknowledged batches of seed['batchSize']."""
+        count = seed.get('count', 0)
+        batch_size = seed.get('batchSize', 100)
+        if type(count) is not int or count < 0 or type(batch_size) is not int or batch_size < 1:
+            logging.error(f"Skipping seed for {collection.full_name}: count must be an integer >= 0 and batchSize an integer >= 1 (got count={count!r}, batchSize={batch_size!r})")
+            return
+
+        parameters = seed.get('parameters', [])
+        param_names = [param.get('name') for param in parameters]
+        generators = self._param_generators(parameters)
+        build_doc = self._get_template_builder(seed.get('document', {}), param_names)
+
+        # Warm-up data does not need acknowledgements; the measured commands keep the default write concern
+        unacknowledged = collection.with_options(write_concern=WriteConcern(w=0))
+        logging.info(f"Seeding {count} documents into {collection.full_name}")
+        for start in range(0, count, batch_size):
+            rows = self._generate_param_rows(generators, min(batch_size, count - start))
+            unacknowledged.insert_many([build_doc(pv) for pv in rows], ordered=False)
+
     def run_startup(self, workloadName: str) -> None:
 
         try:
@@ -46,16 +288,19 @@ class DocumentDBExecutor(BaseExecutor):
             logging.info(f"Executing startup script file: {startup}")
 
             with open(startup, 'r', encoding='utf-8') as file:
-                mongoConfig = yaml.safe_load(file)
+                mongoConfig = yaml.load(file, Loader=settings.YamlLoader)
             for db in mongoConfig.get('databases', []):
                 db_name = db.get('name')
                 collections = db.get('collections', [])
+                database = self.client.get_database(db_name)
+                # One listCollections round-trip per database
+                existing_collections = set(database.list_collection_names()) if collections else set()
                 for coll in collections:
                     coll_name = coll.get('name')
-                    database = self.client.get_database(db_name)
                     
-                    if coll_name not in database.list_collection_names():
+                    if coll_name not in existing_collections:
                         dbcoll = database.create_collection(coll_name)
+                        existing_collections.add(coll_name)
                     else:
                         dbcoll = database.get_collection(coll_name)
                   
@@ -68,18 +313,36 @@ class DocumentDBExecutor(BaseExecutor):
                         })
 
                     indexes = coll.get('indexes', [])
+                    index_models = []
                     for index in indexes:
                         index_name = index.get('name')
                         keys = index.get('keys', {})
                         options = index.get('options', {})
 
-                        dbcoll.create_index(keys, name=index_name, **options)
+                        index_models.append(IndexModel(keys, name=index_name, **options))
+
+                    # Single createIndexes round-trip per collection
+                    if index_models:
+                        dbcoll.create_indexes(index_models)
+
+                    seed = coll.get('seed')
+                    if seed:
+                        self._seed_collection(dbcoll, seed)
 
             self._disconnect()
         except Exception as e:
             logging.error(f"Error occurred while executing startup script file: {startup}. Exception: {e}")
 
-    def execute(self, command: Dict, task_name: str) -> None:
+    def execute(self, command: Dict, task_name: str, cache_key: Optional[str] = None) -> None:
+        """
+        Compatibility entry point for the BaseExecutor interface. Slow path: it resolves a new
+        CommandPlan (and, without cache_key, its key string) on every call; task functions
+        build the plan once and call execute_plan.
+        """
+        self.execute_plan(CommandPlan.from_command(command, task_name, cache_key))
+
+    def execute_plan(self, plan: CommandPlan) -> None:
+        """Execute a command resolved ahead of time by CommandPlan.from_command."""
         if self.client is None:
             logging.info("No DocumentDB client available. Attempting to connect.")
             self._connect()
@@ -87,93 +350,96 @@ class DocumentDBExecutor(BaseExecutor):
                 logging.error("Connection to DocumentDB failed.")
                 return
 
-        db_name = command.get('database')
-        db = self.client[db_name]
+        db = self.client[plan.db_name]
 
-        update_template = {}
-        command_type = command.get('type')
-        batch_size = command.get('batchSize', 1)
-        if command_type == 'insert':
-            json_template = command.get('document', {})
-        elif command_type == 'aggregate':
-            json_template = command.get('pipeline', [])
-        elif command_type in ('find', 'delete', 'update', 'replace'):
-            json_template = command.get('filter', {})
-            if command_type == 'update':
-                update_template = command.get('update', {})
-            elif command_type == 'replace':
-                update_template = command.get('replacement', {})
-        else:
-            json_template = {}
+        task_name = plan.task_name
+        command_type = plan.command_type
+        batch_size = plan.batch_size
+        json_template = plan.json_template
+        update_template = plan.update_template
 
-        cache_key = f"{task_name}:{command_type}"
+        cache_key = plan.cache_key
         cache = self._param_map_cache.get(cache_key)
         if not cache:
-            parameters = command.get('parameters', [])
+            parameters = plan.parameters
             param_names = [param.get('name') for param in parameters]
-            param_paths_dict = self._map_all_param_paths(json_template, param_names)
-            param_paths_dict_upd = self._map_all_param_paths(update_template, param_names)
-            cache = {
-                'parameters': parameters,
-                'param_names': param_names,
-                'param_paths_dict': param_paths_dict,
-                'param_paths_dict_upd': param_paths_dict_upd
-            }
+            cache = self._param_generators(parameters)
+            cache.update({
+                'build_doc': self._get_template_builder(json_template, param_names),
+                # Only update/replace carry a second template
+                'build_upd': self._get_template_builder(update_template, param_names) if update_template else None,
+                'op_kind': OP_KINDS.get(command_type),
+                'no_params': not parameters
+            })
             self._param_map_cache[cache_key] = cache
+        build_doc = cache['build_doc']
+
+        if cache['no_params'] and command_type != 'insert':
+            # pymongo does not mutate filters, updates or pipelines, so placeholder-free templates are shared
+            bulkInsert = [json_template]
+            final_command = json_template
+            upd_command = update_template
         else:
-            parameters = cache['parameters']
-            param_names = cache['param_names']
-            param_paths_dict = cache['param_paths_dict']
-            param_paths_dict_upd = cache['param_paths_dict_upd']
-
-        bulkInsert = []
-        for i in range(batch_size):
-            param_values = {param['name']: DataManager.generate_param_value(param) for param in parameters}
-            final_command = self._replace_all_params(json_template, param_paths_dict, param_values)
-            bulkInsert.append(final_command)
-        
-        upd_command = self._replace_all_params(update_template, param_paths_dict_upd, param_values)
-
-        collection_name = command.get('collection')
+            # Inserts still need a fresh document each time: pymongo adds _id to inserted dicts
+            param_values_list = [{}] * batch_size if cache['no_params'] else self._generate_param_rows(cache, batch_size)
+            bulkInsert = [build_doc(pv) for pv in param_values_list]
+            final_command = bulkInsert[-1]
+
+            build_upd = cache['build_upd']
+            upd_command = build_upd(param_values_list[-1]) if build_upd else update_template
+
+        collection_name = plan.collection_name
         collection = db[collection_name] if collection_name else None
 
-        db_op = None
-        projection = None
-        limit = 0
-        sort = None
+        # Optionally coalesce writes from consecutive executions into one unordered bulk_write
+        bulk_write_size = plan.bulk_write_size
+        if bulk_write_size > 1 and command_type in ('insert', 'update', 'replace', 'delete'):
+            operations = self._write_operations(command_type, bulkInsert, final_command, upd_command)
+            self._buffer_writes(cache_key, task_name, collection, operations, bulk_write_size, plan.bulk_write_max_delay_ms)
+            return
 
-        if command_type == 'insert':
-            if batch_size > 1:
-                db_op = lambda: collection.insert_many(bulkInsert, ordered=False)
-            else:
-                db_op = lambda: collection.insert_one(final_command)
-        elif command_type == 'aggregate':
-            db_op = lambda: collection.aggregate(final_command).to_list()
-        elif command_type == 'find':
-            projection = command.get('projection', None)
-            limit = command.get('limit', 0)
-            sort = command.get('sort', None)
-            db_op = lambda: collection.find(filter=final_command, projection=projection, limit=limit, sort=sort).to_list()
-        elif command_type == 'update':
-            db_op = lambda: collection.update_one(final_command, upd_command, upsert=True)
-        elif command_type == 'replace':
-            db_op = lambda: collection.replace_one(final_command, upd_command, upsert=True)
-        elif command_type == 'delete':
-            db_op = lambda: collection.delete_one(final_command)
-        else:
+        op_kind = cache['op_kind']
+        projection = plan.projection
+        limit = plan.limit
+        sort = plan.sort
+
+        if op_kind is None:
             logging.error(f"Unsupported DocumentDB command type: {command_type}")
             return
+        if op_kind == OP_INSERT_ONE and batch_size > 1:
+            op_kind = OP_INSERT_MANY
 
-        logging.debug(f"Executing DocumentDB {command_type} command: {final_command}{', update: ' + str(upd_command) if upd_command else ''}{', projection: ' + str(projection) if projection else ''}{', limit: ' + str(limit) if limit else ''}{', sort: ' + str(sort) if sort else ''}")
+        # Lazy %-formatting behind the level check; documents are only stringified when debug is on
+        debug_enabled = _log.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            _log.debug("Executing DocumentDB %s command: %s%s%s%s%s", command_type, final_command,
+                       f", update: {upd_command}" if upd_command else '',
+                       f", projection: {projection}" if projection else '',
+                       f", limit: {limit}" if limit else '',
+                       f", sort: {sort}" if sort else '')
 
-        start_time = time.perf_counter()
+        start_ns = time.perf_counter_ns()
         try:
-            result = db_op()
-            total_time = int((time.perf_counter() - start_time) * 1000)
-            logging.debug(f"DocumentDB {command_type} command result: {result}")
-            length = sys.getsizeof(result)
-            self._fire_event('DocumentDB', task_name, total_time, response_length=length)
+            # Direct calls by operation kind (no per-call closure); ordered by frequency in typical workloads
+            if op_kind == OP_INSERT_ONE:
+                result = collection.insert_one(final_command)
+            elif op_kind == OP_FIND:
+                result = collection.find(filter=final_command, projection=projection, limit=limit, sort=sort).to_list()
+            elif op_kind == OP_INSERT_MANY:
+                result = collection.insert_many(bulkInsert, ordered=False)
+            elif op_kind == OP_UPDATE:
+                result = collection.update_one(final_command, upd_command, upsert=True)
+            elif op_kind == OP_REPLACE:
+                result = collection.replace_one(final_command, upd_command, upsert=True)
+            elif op_kind == OP_DELETE:
+                result = collection.delete_one(final_command)
+            else:
+                result = collection.aggregate(final_command).to_list()
         except Exception as e:
-            total_time = int((time.perf_counter() - start_time) * 1000)
-            self._fire_event('DocumentDB-Error', task_name, total_time, exception=e)
-            logging.exception(f"Error executing DocumentDB command: {e}")
+            self._report_error(task_name, (time.perf_counter_ns() - start_ns) // 1_000_000, e, "Error executing DocumentDB command")
+            return
+        total_time = (time.perf_counter_ns() - start_ns) // 1_000_000
+
+        if debug_enabled:
+            _log.debug("DocumentDB %s command result: %s", command_type, result)
+        self._fire_event('DocumentDB', task_name, total_time, response_length=_response_length(op_kind, result, bulkInsert))
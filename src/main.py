@@ -1,9 +1,10 @@
 from locust import User, events
 from locust.runners import MasterRunner, LocalRunner
-from executors.documentdb_executor import DocumentDBExecutor
+from executors.documentdb_executor import CommandPlan, DocumentDBExecutor
 import settings
 from settings import Settings, StartUpFrequency
 import logging
+import sys
 from typing import Any, Callable
 
 logging.basicConfig(level=logging.INFO)
@@ -12,6 +13,8 @@ all_profiles = settings.init_settings()
 @events.init_command_line_parser.add_listener
 def _(parser):
     parser.add_argument("--documentdb-connection-string", type=str, is_required=True, is_secret=True, help="Format: mongodb+srv://<username>:<password>@<cluster-address>/?tls=true&authMechanism=SCRAM-SHA-256&retrywrites=false&maxIdleTimeMS=120000")
+    parser.add_argument("--documentdb-max-pool-size", type=int, default=None, include_in_web_ui=False, help="Max concurrent connections shared by all users in a process (0 = no limit). Defaults to the connection string value or 200")
+    parser.add_argument("--documentdb-compressors", type=str, default=None, include_in_web_ui=False, help="Comma-separated wire compressors in order of preference (zstd, snappy, zlib), or 'none' to disable. Defaults to the connection string value or zstd,snappy,zlib")
 
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
@@ -23,11 +26,27 @@ def on_test_start(environment, **kwargs):
                 uc(environment).run_startup()
             else:
                 logging.info(f"Skipping startup for user class: {uc.__name__}")
+        # The master runs no users, so it does not need to keep the startup connection pool
+        if isinstance(environment.runner, MasterRunner):
+            DocumentDBExecutor.close_clients()
+    if not isinstance(environment.runner, MasterRunner):
+        DocumentDBExecutor.start_event_flusher(environment)
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    # Users have stopped (and flushed their writes) by now; report what is still queued
+    DocumentDBExecutor.stop_event_flusher(environment)
+
+@events.quitting.add_listener
+def on_quitting(environment, **kwargs):
+    DocumentDBExecutor.close_clients()
 
 
 def create_task_function(command, task_name) -> Callable:
+    # Resolved once per task so execution does not re-read the command (or rebuild its cache key) on every call
+    plan = CommandPlan.from_command(command, task_name, sys.intern(f"{task_name}:{command.get('type')}"))
     def task_func(self):
-        self.executor.execute(command, task_name)
+        self.executor.execute_plan(plan)
     task_func.__name__ = task_name
     return task_func
 
@@ -62,8 +81,7 @@ def create_user_class(class_name: str, workload_settings: Settings):
         func = create_task_function(task_def.command, fullTaskName)
         setattr(DynamicUser, task_def.taskName, func)
         logging.info(f"Adding task {task_def.taskName}:weight {task_def.taskWeight} to user class {class_name}")
-        for i in range(task_def.taskWeight):
-            task_list.append(func)
+        task_list.extend((func,) * task_def.taskWeight)
     
     DynamicUser.tasks = task_list
     DynamicUser.__name__ = class_name
@@ -2,16 +2,20 @@ from typing import List, Dict, Any
 from dataclasses import dataclass
 from pathlib import Path
 from enum import Enum
-import json
+import orjson
 import logging
 import yaml
 
+# C-accelerated YAML loader when libyaml is available
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 class StartUpFrequency(Enum):
     NEVER = "never"
     ONCE = "once"
     ALWAYS = "always"
 
-@dataclass
+# Loaded once at startup and read-only afterwards
+@dataclass(slots=True, frozen=True)
 class TaskConfig:
     taskWeight: int
     taskName: str
@@ -25,7 +29,7 @@ class TaskConfig:
             command=data.get("command", {})
         )
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Settings:
     workloadName: str
     type: str
@@ -65,11 +69,11 @@ def init_settings() -> List[Settings]:
         if config_file.suffix.lower() not in ['.json', '.yaml', '.yml'] or config_file.stem.lower().endswith('_startup'):
             continue
         try:
-            with open(config_file, 'r', encoding='utf-8') as file:
+            with open(config_file, 'rb') as file:
                 if config_file.suffix.lower() == '.json':
-                    config = json.load(file)
+                    config = orjson.loads(file.read())
                 else:
-                    config = yaml.safe_load(file)
+                    config = yaml.load(file, Loader=YamlLoader)
             workload_name = config_file.stem
             
             run_startup_frequency_value = config.get("runStartUpFrequency", "Never")